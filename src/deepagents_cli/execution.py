@@ -6,6 +6,7 @@ import re
 import sys
 import termios
 import tty
+from pathlib import Path
 from typing import Any
 
 from langchain.agents.middleware.human_in_the_loop import (
@@ -37,6 +38,7 @@ from deepagents_cli.ui import (
     render_todo_list,
 )
 from react_agent.context import Context
+from react_agent.project_snapshot import ProjectSettings
 
 _HITL_REQUEST_ADAPTER = TypeAdapter(HITLRequest)
 
@@ -317,6 +319,11 @@ async def execute_task(
 
     # Stream input - may need to loop if there are interrupts
     stream_input = {"messages": [{"role": "user", "content": message_content}]}
+    # One context per task, so resumed streams share the same project settings.
+    # Deferred mode collapses the task's tool calls into one write, done in the
+    # finally block below (or earlier by the run tool).
+    project_settings = ProjectSettings(Path.cwd(), persist_mode="deferred")
+    context = Context(backend=backend, project_settings=project_settings)
     try:
         while True:
             interrupt_occurred = False
@@ -325,8 +332,6 @@ async def execute_task(
             # Track all pending interrupts: {interrupt_id: request_data}
             pending_interrupts: dict[str, HITLRequest] = {}
 
-            context = Context(backend=backend)
-
             async for chunk in agent.astream(
                 stream_input,
                 stream_mode=["messages", "updates"],  # Dual-mode for HITL support
@@ -760,6 +765,10 @@ async def execute_task(
 
         return
 
+    finally:
+        # Write the project settings changes made during the task
+        await project_settings.aflush()
+
     if spinner_active:
         status.stop()
 
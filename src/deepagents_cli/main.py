@@ -43,6 +43,7 @@ from deepagents_cli.ui import TokenTracker, show_help
 
 # Import the graph creation functions from react_agent
 from react_agent.graph import create_graph
+from react_agent.mcp import prewarm_mcp_tools
 
 
 def parse_args():
@@ -412,6 +413,9 @@ def cli_main() -> None:
                 auto_approve=args.auto_approve, no_splash=args.no_splash
             )
 
+            # Spawn the MCP servers while the sandbox and graph are set up
+            prewarm_mcp_tools()
+
             # API key validation happens in create_model()
             asyncio.run(
                 main(
@@ -0,0 +1,86 @@
+"""In-memory checkpointer with bounded per-thread history."""
+
+from collections import Counter
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+class BoundedInMemorySaver(InMemorySaver):
+    """InMemorySaver that keeps only the most recent checkpoints per thread.
+
+    The stock InMemorySaver never evicts anything, so memory grows with every
+    agent step. Here, once a (thread, namespace) holds more than
+    `max_checkpoints` checkpoints, the oldest are dropped together with their
+    pending writes and any channel blobs no remaining checkpoint refers to.
+    """
+
+    def __init__(self, *, max_checkpoints: int = 32, **kwargs: Any) -> None:
+        """Initialize the saver.
+
+        Args:
+            max_checkpoints: Number of checkpoints to keep per thread and namespace.
+            **kwargs: Passed through to InMemorySaver.
+        """
+        if max_checkpoints < 1:
+            raise ValueError("max_checkpoints must be at least 1.")
+        super().__init__(**kwargs)
+        self.max_checkpoints = max_checkpoints
+        # Blob key -> number of stored checkpoints referencing it
+        self._blob_refs: Counter[tuple[str, str, str, Any]] = Counter()
+        # (thread_id, checkpoint_ns, checkpoint_id) -> blob keys it references
+        self._checkpoint_blobs: dict[
+            tuple[str, str, str], list[tuple[str, str, str, Any]]
+        ] = {}
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint, then evict the oldest ones beyond the limit."""
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+
+        blob_keys = [
+            (thread_id, checkpoint_ns, channel, version)
+            for channel, version in checkpoint["channel_versions"].items()
+        ]
+        self._blob_refs.update(blob_keys)
+        self._checkpoint_blobs[(thread_id, checkpoint_ns, checkpoint["id"])] = blob_keys
+
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        while len(checkpoints) > self.max_checkpoints:
+            # Checkpoint ids are time-ordered and dicts keep insertion order
+            oldest = next(iter(checkpoints))
+            del checkpoints[oldest]
+            self._evict(thread_id, checkpoint_ns, oldest)
+        return next_config
+
+    def _evict(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> None:
+        """Drop the writes and unreferenced blobs of an evicted checkpoint."""
+        self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        for key in self._checkpoint_blobs.pop(
+            (thread_id, checkpoint_ns, checkpoint_id), ()
+        ):
+            self._blob_refs[key] -= 1
+            if self._blob_refs[key] <= 0:
+                del self._blob_refs[key]
+                self.blobs.pop(key, None)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and bookkeeping for a thread."""
+        super().delete_thread(thread_id)
+        for checkpoint_key in [k for k in self._checkpoint_blobs if k[0] == thread_id]:
+            del self._checkpoint_blobs[checkpoint_key]
+        for blob_key in [k for k in self._blob_refs if k[0] == thread_id]:
+            del self._blob_refs[blob_key]
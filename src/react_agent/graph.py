@@ -1,13 +1,8 @@
 """Define the agent graph configuration."""
 
+import threading
 from typing import TYPE_CHECKING, Any, cast
 
-from deepagents import create_deep_agent
-from deepagents.backends import FilesystemBackend
-from langchain.chat_models import init_chat_model
-from langchain_core.language_models import BaseChatModel
-from langgraph.checkpoint.memory import InMemorySaver
-
 from react_agent.context import Context
 from react_agent.mcp import get_mcp_tools
 from react_agent.prompts import (
@@ -18,9 +13,12 @@ from react_agent.prompts import (
 )
 from react_agent.tools import (
     add_constraint,
+    add_constraints,
     add_scenario,
     add_solver_script,
     available_python_dependencies,
+    batch_search,
+    clear_search_cache,
     read_problem_specification,
     remove_constraint,
     remove_scenario,
@@ -34,49 +32,113 @@ from react_agent.tools import (
 
 if TYPE_CHECKING:
     from deepagents.middleware.subagents import CompiledSubAgent, SubAgent
+    from langchain_core.language_models import BaseChatModel
 
 WORKING_DIR = "./working_dir_default"
 
+# Chat models keyed by "provider:model" string, reused across create_graph calls
+_chat_model_cache: dict[str, "BaseChatModel"] = {}
+_chat_model_lock = threading.Lock()
+
+
+def _get_chat_model(model_str: str) -> "BaseChatModel":
+    """Return a cached chat model for the model string, creating it on first use."""
+    from langchain.chat_models import init_chat_model
+
+    with _chat_model_lock:
+        chat_model = _chat_model_cache.get(model_str)
+        if chat_model is None:
+            chat_model = _chat_model_cache[model_str] = init_chat_model(model_str)
+        return chat_model
+
+
+def clear_chat_model_cache() -> None:
+    """Drop all cached chat models."""
+    with _chat_model_lock:
+        _chat_model_cache.clear()
+
+
+# Tool sets for the main agent and each subagent; immutable so every graph and
+# spec can share them
+_MAIN_TOOLS: tuple[Any, ...] = (
+    read_problem_specification,
+    search,
+    batch_search,
+    clear_search_cache,
+    run,
+)
+_FORMULATOR_TOOLS: tuple[Any, ...] = (
+    read_problem_specification,
+    update_project_metadata,
+    add_constraint,
+    add_constraints,
+    remove_constraint,
+)
+_DESIGNER_TOOLS: tuple[Any, ...] = (
+    read_problem_specification,
+    update_request_schema,
+    update_response_schema,
+    add_scenario,
+    remove_scenario,
+)
+_BASE_SOLVER_TOOLS: tuple[Any, ...] = (
+    read_problem_specification,
+    available_python_dependencies,
+    search,
+    batch_search,
+    clear_search_cache,
+    add_solver_script,
+    remove_solver_script,
+    run,
+)
+
+# Subagent specs keyed by the identities of the extra tools they were built
+# with. The tools are stored alongside so their ids can't be reused while cached.
+_SUBAGENTS_CACHE_SIZE = 8
+_subagents_cache: dict[
+    tuple[int, ...], tuple[tuple[Any, ...], list[dict[str, Any]]]
+] = {}
+
 
 def get_subagents(
     extra_tools: list[Any] | None = None,
 ) -> list[dict[str, Any]]:
-    """Get the list of subagents, optionally injecting extra tools."""
-    solver_tools = [
-        read_problem_specification,
-        available_python_dependencies,
-        search,
-        add_solver_script,
-        remove_solver_script,
-        run,
-    ]
+    """Get the list of subagents, optionally injecting extra tools.
 
-    if extra_tools:
-        solver_tools.extend(extra_tools)
+    Results are cached by the identity of the extra tools, so repeated calls
+    with the same tools return the same list. Callers must not mutate it.
+    """
+    extras = tuple(extra_tools or ())
+    key = tuple(id(tool) for tool in extras)
+    cached = _subagents_cache.get(key)
+    if cached is not None:
+        return cached[1]
+
+    subagents = _build_subagents(extras)
+    if len(_subagents_cache) >= _SUBAGENTS_CACHE_SIZE:
+        _subagents_cache.pop(next(iter(_subagents_cache)))
+    _subagents_cache[key] = (extras, subagents)
+    return subagents
+
+
+def _build_subagents(extra_tools: tuple[Any, ...]) -> list[dict[str, Any]]:
+    """Build the subagent specs for the given extra solver tools."""
+    solver_tools = (
+        _BASE_SOLVER_TOOLS + extra_tools if extra_tools else _BASE_SOLVER_TOOLS
+    )
 
     return [
         {
             "name": "problem_formulator",
             "description": "Clarifies and structures the optimization problem specification.",
             "system_prompt": PROBLEM_FORMULATOR_PROMPT,
-            "tools": [
-                read_problem_specification,
-                update_project_metadata,
-                add_constraint,
-                remove_constraint,
-            ],
+            "tools": _FORMULATOR_TOOLS,
         },
         {
             "name": "schema_dataset_designer",
             "description": "Designs request/response schemas and manages the scenario dataset.",
             "system_prompt": SCHEMA_DATASET_DESIGNER_PROMPT,
-            "tools": [
-                read_problem_specification,
-                update_request_schema,
-                update_response_schema,
-                add_scenario,
-                remove_scenario,
-            ],
+            "tools": _DESIGNER_TOOLS,
         },
         {
             "name": "solver_coder",
@@ -88,7 +150,7 @@ def get_subagents(
 
 
 async def create_graph(
-    model: BaseChatModel | str | None = None,
+    model: "BaseChatModel | str | None" = None,
     backend: Any = None,
     context: Context | None = None,
     extra_tools: list[Any] | None = None,
@@ -109,6 +171,13 @@ async def create_graph(
     Returns:
         The configured agent graph.
     """
+    # Imported here rather than at module level: deepagents pulls in most of
+    # langchain and takes about a second to import
+    from deepagents import create_deep_agent
+    from deepagents.backends import FilesystemBackend
+
+    from react_agent.checkpoint import BoundedInMemorySaver
+
     # Determine the model to use
     if model is None:
         if context is None:
@@ -116,11 +185,11 @@ async def create_graph(
         # Convert model string from "provider/model" to "provider:model" format
         # that init_chat_model expects
         model_str = context.model.replace("/", ":", 1)
-        chat_model = init_chat_model(model_str)
+        chat_model = _get_chat_model(model_str)
     elif isinstance(model, str):
         # Convert model string from "provider/model" to "provider:model" format
         model_str = model.replace("/", ":", 1)
-        chat_model = init_chat_model(model_str)
+        chat_model = _get_chat_model(model_str)
     else:
         chat_model = model
 
@@ -134,11 +203,11 @@ async def create_graph(
         extra_tools = await get_mcp_tools()
 
     return create_deep_agent(
-        tools=[read_problem_specification, search, run],
+        tools=_MAIN_TOOLS,
         backend=backend,
         system_prompt=BASE_SYSTEM_PROMPT,
         model=chat_model,
         context_schema=Context,
         subagents=cast("list[SubAgent | CompiledSubAgent]", get_subagents(extra_tools)),
-        checkpointer=InMemorySaver(),
+        checkpointer=BoundedInMemorySaver(),
     )
@@ -1,45 +1,179 @@
 """MCP (Model Context Protocol) integration for Context7 documentation search."""
 
+import asyncio
+import concurrent.futures
+import functools
+import logging
 import os
-from typing import Any
+import shutil
+import threading
+from typing import TYPE_CHECKING, Any
 
-from langchain_mcp_adapters.client import MultiServerMCPClient
+if TYPE_CHECKING:
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+
+# Never print: stdio MCP transports use stdout for protocol frames
+logger = logging.getLogger(__name__)
+
+# Process-wide cache of the resolved MCP tools. Spawning the stdio server and
+# running the capability handshake takes seconds, so it is done once and reused
+# by every subsequent create_graph call.
+_mcp_client: "MultiServerMCPClient | None" = None
+_mcp_tools_cache: list[Any] | None = None
+_mcp_lock = asyncio.Lock()
+# Background load started by prewarm_mcp_tools, consumed by get_mcp_tools
+_mcp_prewarm: "concurrent.futures.Future[tuple[Any, list[Any], bool]] | None" = None
+
+# Generous enough for a cold `npx -y` download, short enough not to hang startup
+DEFAULT_MCP_TIMEOUT_S = 20.0
+
+# Set e.g. CONTEXT7_MCP_PACKAGE=@upstash/context7-mcp@<version> to pin a release
+CONTEXT7_MCP_PACKAGE = os.getenv("CONTEXT7_MCP_PACKAGE", "@upstash/context7-mcp")
+
+
+def invalidate_mcp_cache() -> None:
+    """Drop the cached MCP client, tools and npx check so the next call reloads them."""
+    global _mcp_client, _mcp_tools_cache, _mcp_prewarm
+    _mcp_client = None
+    _mcp_tools_cache = None
+    _mcp_prewarm = None
+    _npx_available.cache_clear()
+
+
+@functools.cache
+def _npx_available() -> bool:
+    """Check once whether npx is on PATH, warning if it is missing."""
+    if shutil.which("npx") is None:
+        logger.warning("CONTEXT7_API_KEY is set but npx is not installed")
+        return False
+    return True
+
+
+def _mcp_server_configs() -> dict[str, Any]:
+    """Build MCP server connection configs for the servers enabled in the environment."""
+    servers: dict[str, Any] = {}
+
+    context7_api_key = os.getenv("CONTEXT7_API_KEY")
+    if context7_api_key and _npx_available():
+        # Configure MCP client to run Context7 server via npx
+        # The Context7 MCP server is published as @upstash/context7-mcp.
+        # --prefer-offline reuses the npx cache instead of re-resolving the
+        # dist-tag against the registry on every launch.
+        servers["context7"] = {
+            "command": "npx",
+            "args": ["-y", "--prefer-offline", CONTEXT7_MCP_PACKAGE],
+            "transport": "stdio",
+            "env": {
+                "CONTEXT7_API_KEY": context7_api_key,
+            },
+        }
+
+    return servers
+
+
+async def _load_mcp_tools(
+    connections: dict[str, Any],
+) -> tuple["MultiServerMCPClient", list[Any], bool]:
+    """Query every configured server concurrently, skipping ones that fail.
+
+    Returns:
+        The client, the tools that loaded, and whether every server succeeded.
+    """
+    # Only needed when an MCP server is enabled, so imported lazily
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+
+    timeout = float(os.getenv("CONTEXT7_TIMEOUT_S", DEFAULT_MCP_TIMEOUT_S))
+    client = MultiServerMCPClient(connections)
+    results = await asyncio.gather(
+        *(
+            asyncio.wait_for(client.get_tools(server_name=name), timeout)
+            for name in connections
+        ),
+        return_exceptions=True,
+    )
+
+    tools: list[Any] = []
+    complete = True
+    for name, result in zip(connections, results):
+        if isinstance(result, Exception):
+            # If a server fails to load, log it and carry on without it.
+            # This ensures the agent can still function without Context7
+            logger.warning("Failed to load %s MCP tools: %r", name, result)
+            complete = False
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            tools.extend(result)
+    return client, tools, complete
+
+
+def prewarm_mcp_tools() -> None:
+    """Start loading MCP tools in a background thread.
+
+    Meant to be called by an application entry point, so the MCP servers are
+    spawned and queried while the rest of the application starts up and the
+    first `get_mcp_tools` call finds the tools ready. Does nothing if no
+    server is configured or a prewarm is already running.
+    """
+    global _mcp_prewarm
+
+    connections = _mcp_server_configs()
+    if not connections or _mcp_prewarm is not None or _mcp_tools_cache is not None:
+        return
+
+    future: concurrent.futures.Future[tuple[Any, list[Any], bool]] = (
+        concurrent.futures.Future()
+    )
+
+    def worker() -> None:
+        try:
+            future.set_result(asyncio.run(_load_mcp_tools(connections)))
+        except BaseException as e:
+            future.set_exception(e)
+
+    _mcp_prewarm = future
+    threading.Thread(target=worker, name="mcp-prewarm", daemon=True).start()
 
 
 async def get_mcp_tools() -> list[Any]:
     """Load MCP tools from Context7 if API key is configured.
 
+    Each configured server is queried concurrently and must answer within
+    CONTEXT7_TIMEOUT_S seconds; servers that fail or time out are skipped.
+    The tools are loaded once per process and cached; use
+    `invalidate_mcp_cache` to force a reload.
+
     Returns:
         List of MCP tools if CONTEXT7_API_KEY is set, empty list otherwise.
     """
-    context7_api_key = os.getenv("CONTEXT7_API_KEY")
+    global _mcp_client, _mcp_tools_cache, _mcp_prewarm
 
-    if not context7_api_key:
-        # Context7 integration is disabled - return empty list
+    # Cached tools are returned without re-reading the environment or PATH
+    if _mcp_tools_cache is not None:
+        return _mcp_tools_cache
+
+    connections = _mcp_server_configs()
+    if not connections:
+        # No MCP integration is enabled - return empty list
         return []
 
-    try:
-        # Configure MCP client to run Context7 server via npx
-        # The Context7 MCP server is published as @upstash/context7-mcp
-        client = MultiServerMCPClient(
-            {
-                "context7": {
-                    "command": "npx",
-                    "args": ["-y", "@upstash/context7-mcp"],
-                    "transport": "stdio",
-                    "env": {
-                        "CONTEXT7_API_KEY": context7_api_key,
-                    },
-                }
-            }
-        )
-
-        # Get tools from the MCP server
-        tools = await client.get_tools()
-        return tools
+    async with _mcp_lock:
+        if _mcp_tools_cache is not None:
+            return _mcp_tools_cache
 
-    except Exception as e:
-        # If there's any error loading MCP tools, log it and return empty list
-        # This ensures the agent can still function without Context7
-        print(f"Warning: Failed to load Context7 MCP tools: {e}")
-        return []
+        prewarm, _mcp_prewarm = _mcp_prewarm, None
+        result = None
+        if prewarm is not None:
+            try:
+                result = await asyncio.wrap_future(prewarm)
+            except Exception as e:
+                logger.warning("Failed to prewarm MCP tools: %r", e)
+        if result is None:
+            result = await _load_mcp_tools(connections)
+
+        client, tools, complete = result
+        # Partial results are returned but not cached so a later call can retry
+        if complete:
+            _mcp_client = client
+            _mcp_tools_cache = tools
+        return tools
@@ -1,12 +1,15 @@
 """Project settings management for optimization problems."""
 
+import asyncio
 import threading
-from collections.abc import Callable, Mapping
+import weakref
+from collections.abc import Callable, Iterable, Mapping
 from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Any, Generator, TypeVar
+from typing import Any, Generator, Literal, ParamSpec, TypeVar
 
-from react_agent.storage import JsonFileStore
+from react_agent.storage import DirectoryLock, JsonFileStore
 from react_agent.types import (
     Constraint,
     ProjectSnapshot,
@@ -16,20 +19,60 @@ from react_agent.types import (
 )
 
 T = TypeVar("T")
+P = ParamSpec("P")
 
 
 class ProjectSettings:
     """Manages project settings and persistence for optimization problems."""
 
-    # Class-level lock for thread-safe file access across all instances
-    _lock = threading.Lock()
+    # One lock per project directory, shared by all instances pointing at it,
+    # so projects in different directories don't serialize against each other.
+    # Held weakly: a lock is dropped once no instance uses its directory.
+    _locks: "weakref.WeakValueDictionary[Path, DirectoryLock]" = (
+        weakref.WeakValueDictionary()
+    )
+    _locks_guard = threading.Lock()
 
     def __init__(
-        self, directory: Path, project_snapshot: ProjectSnapshot | None = None
+        self,
+        directory: Path,
+        project_snapshot: ProjectSnapshot | None = None,
+        *,
+        persist_mode: Literal["eager", "deferred"] = "eager",
+        pretty: bool = False,
+        durable: bool = True,
     ):
-        """Initialize project settings from directory or provided snapshot."""
+        """Initialize project settings from directory or provided snapshot.
+
+        Args:
+            directory: Project directory containing optigen.json.
+            project_snapshot: Snapshot to start from if no file exists yet.
+            persist_mode: "eager" writes the file after every mutation.
+                "deferred" only marks the settings dirty and writes once on
+                `flush()`, collapsing bursts of tool calls into one write.
+                Use the settings as a context manager so the session's
+                changes are flushed when it ends.
+            pretty: Indent optigen.json for human inspection. The file is
+                written compactly by default since it is machine-managed.
+            durable: fsync every write of optigen.json. Disable for
+                temporary projects such as tests, where crash safety
+                doesn't matter.
+        """
         self.directory = directory
-        self.store = JsonFileStore(directory / "optigen.json")
+        self.store = JsonFileStore(directory / "optigen.json", durable=durable)
+        self._lock = self._get_lock()
+        self.persist_mode = persist_mode
+        self.pretty = pretty
+        self._dirty = False
+        # Nesting depth of batch() blocks; mutations inside one are not written
+        self._batch_depth = 0
+        # Thread running the open batch() block, which holds the lock until it ends
+        self._batch_thread: int | None = None
+        # Bumped on every change to the snapshot; keys the cached JSON below
+        self._version = 0
+        self._json_cache: tuple[int, str] | None = None
+        # Undo steps for the in-place list edits of the running transaction
+        self._journal: list[Callable[[], object]] | None = None
 
         content = self.store.load()
         if content:
@@ -37,13 +80,77 @@ class ProjectSettings:
         else:
             self.project_snapshot = project_snapshot or ProjectSnapshot()
 
+    def _get_lock(self) -> DirectoryLock:
+        """Return the lock shared by all instances using the same settings file."""
+        directory = self.store.path.parent.resolve()
+        with self._locks_guard:
+            lock = self._locks.get(directory)
+            if lock is None:
+                lock = self._locks[directory] = DirectoryLock(directory)
+            return lock
+
+    @property
+    def project_snapshot(self) -> ProjectSnapshot:
+        """The current in-memory project snapshot."""
+        return self._project_snapshot
+
+    @project_snapshot.setter
+    def project_snapshot(self, snapshot: ProjectSnapshot) -> None:
+        self._project_snapshot = snapshot
+        self._version += 1
+        self._constraint_index: dict[str, int] = {}
+        self._fill_index(self._constraint_index, snapshot.constraints, lambda c: c.name)
+        self._scenario_index: dict[str, int] = {}
+        self._fill_index(self._scenario_index, snapshot.dataset, lambda s: s.name)
+        self._solver_script_index: dict[str, int] = {}
+        self._fill_index(
+            self._solver_script_index, snapshot.solver_scripts, lambda s: s.name
+        )
+
+    @staticmethod
+    def _fill_index(
+        index: dict[Any, int], items: list[T], key: Callable[[T], Any]
+    ) -> None:
+        """Rebuild a key -> list position index in place."""
+        index.clear()
+        # zip/map/range build the pairs in C, without a generator frame per item
+        index.update(zip(map(key, items), range(len(items))))
+
+    def _position(
+        self,
+        items: list[T],
+        key_value: Any,
+        key: Callable[[T], Any],
+        index: dict[Any, int],
+    ) -> int | None:
+        """Find the position of an item by key using its index.
+
+        The index is rebuilt if it no longer matches the list, e.g. when the
+        list was modified directly instead of through ProjectSettings. Only
+        call this while holding the lock; see `_get_by_key` for lookups that
+        don't hold it.
+
+        Returns:
+            The position of the matching item, or None if not found.
+        """
+        if len(index) != len(items):
+            self._fill_index(index, items, key)
+        i = index.get(key_value)
+        if i is not None and key(items[i]) != key_value:
+            self._fill_index(index, items, key)
+            i = index.get(key_value)
+        return i
+
     def _reload_from_disk(self) -> None:
-        """Reload snapshot from disk if file exists.
+        """Reload snapshot from disk if the file changed since we last synced.
 
         This should only be called when holding the lock.
-        Used to capture the latest state before modifications.
+        Used to capture the latest state before modifications. Skipped while
+        there are unflushed deferred changes, since memory is then newer than disk.
         """
-        content = self.store.load()
+        if self._dirty:
+            return
+        content = self.store.load_if_changed()
         if content:
             self.project_snapshot = ProjectSnapshot.model_validate_json(content)
 
@@ -53,7 +160,10 @@ class ProjectSettings:
         This should only be called when already holding the lock.
         Performs atomic write via JsonFileStore.
         """
-        self.store.save_atomic(self.project_snapshot.model_dump_json(indent=2))
+        self.store.save_atomic(
+            self.project_snapshot.model_dump_json(indent=2 if self.pretty else None)
+        )
+        self._dirty = False
 
     def persist_settings(self) -> None:
         """Persist the current project snapshot to disk with thread safety.
@@ -62,25 +172,135 @@ class ProjectSettings:
         when multiple threads access the same file.
         """
         with self._lock:
+            # The snapshot may have been edited directly before this call
+            self._version += 1
             self._persist_unlocked()
 
+    def snapshot_json(self) -> str:
+        """Return the snapshot as indented JSON, cached until the snapshot changes."""
+        cached = self._json_cache
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        version = self._version
+        text = self.project_snapshot.model_dump_json(indent=2)
+        self._json_cache = (version, text)
+        return text
+
+    async def _run_in_thread(
+        self, func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        """Run a blocking method in a worker thread for its async variant.
+
+        Raises:
+            RuntimeError: If called inside a `batch()` block of this thread.
+                The worker would wait forever for the lock the block holds.
+        """
+        if self._batch_thread == threading.get_ident():
+            raise RuntimeError(
+                "Async ProjectSettings methods can't be used inside batch(); "
+                "call the sync methods instead."
+            )
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def apersist_settings(self) -> None:
+        """Async version of `persist_settings`; runs the disk I/O in a worker thread."""
+        await self._run_in_thread(self.persist_settings)
+
+    def flush(self) -> None:
+        """Write pending deferred changes to disk, if any."""
+        with self._lock:
+            if self._dirty:
+                self._persist_unlocked()
+
+    async def aflush(self) -> None:
+        """Async version of `flush`; runs the disk I/O in a worker thread."""
+        await self._run_in_thread(self.flush)
+
+    def __enter__(self) -> "ProjectSettings":
+        """Use the settings for a session; pending changes are flushed on exit."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Flush pending deferred changes when the session ends."""
+        self.flush()
+
+    async def __aenter__(self) -> "ProjectSettings":
+        """Async version of `__enter__`."""
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Async version of `__exit__`."""
+        await self.aflush()
+
+    @contextmanager
+    def batch(self) -> Generator[None, None, None]:
+        """Group several mutations into a single write.
+
+        Mutations inside the block are applied immediately but only written
+        to disk once, when the outermost block exits. In deferred mode the
+        changes still wait for `flush()`. Blocks may be nested.
+
+        The directory lock is held for the whole block. Memory is newer than
+        disk once the first mutation is made, so a write by another instance
+        or process during the block would otherwise be overwritten. For the
+        same reason the async methods, which run in worker threads, raise
+        `RuntimeError` inside the block; use the sync methods there.
+        """
+        with self._lock:
+            if not self._batch_depth:
+                self._batch_thread = threading.get_ident()
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._batch_thread = None
+                    if self._dirty and self.persist_mode == "eager":
+                        self._persist_unlocked()
+
     @contextmanager
     def _transaction(self) -> Generator[None, None, None]:
         """Context manager for thread-safe read-modify-write transactions.
 
-        Acquires lock, reloads from disk, yields control, then persists.
+        Acquires lock, reloads from disk, yields control, then persists
+        (or marks the settings dirty in deferred mode or inside `batch()`).
         Ensures atomic operations and prevents forgetting to persist or reload.
+
+        Nothing is written if the body made no change. If the body or the
+        write fails, the list edits recorded in the journal are undone in
+        reverse order and a replaced snapshot is restored, so memory keeps
+        matching what is on disk without copying the snapshot up front. If
+        the write failed after the new file was already in place, the store
+        forgets its stamp and the next transaction reloads that file.
         """
         with self._lock:
             self._reload_from_disk()
             before = self.project_snapshot
+            self._journal = []
             try:
                 yield
+                if not self._journal and self.project_snapshot is before:
+                    # Nothing changed, e.g. removing a missing item: don't write
+                    return
+                self._version += 1
+                if self.persist_mode == "deferred" or self._batch_depth:
+                    self._dirty = True
+                else:
+                    self._persist_unlocked()
             except Exception:
+                for undo in reversed(self._journal):
+                    undo()
+                # Also rebuilds the indexes the undone edits invalidated
                 self.project_snapshot = before
                 raise
-            else:
-                self._persist_unlocked()
+            finally:
+                self._journal = None
+
+    def _record(self, undo: Callable[[], object]) -> None:
+        """Record how to revert an in-place edit made by the current transaction."""
+        if self._journal is not None:
+            self._journal.append(undo)
 
     def _add_unique(
         self,
@@ -88,6 +308,7 @@ class ProjectSettings:
         item: T,
         key: Callable[[T], Any],
         error_message: str,
+        index: dict[Any, int] | None = None,
     ) -> None:
         """Add an item to a list if it doesn't already exist based on key.
 
@@ -96,50 +317,125 @@ class ProjectSettings:
             item: The item to add.
             key: Function to extract the key from an item for duplicate checking.
             error_message: Error message to raise if duplicate found.
+            index: Optional key -> position index kept in sync with the list.
 
         Raises:
             ValueError: If an item with the same key already exists.
         """
-        if any(key(existing) == key(item) for existing in items):
+        if index is None:
+            if any(key(existing) == key(item) for existing in items):
+                raise ValueError(error_message)
+            items.append(item)
+            self._record(items.pop)
+            return
+
+        if self._position(items, key(item), key, index) is not None:
             raise ValueError(error_message)
+        index[key(item)] = len(items)
         items.append(item)
+        self._record(items.pop)
+
+    def _extend_unique(
+        self,
+        items: list[T],
+        new_items: Iterable[T],
+        key: Callable[[T], Any],
+        error_message: Callable[[T], str],
+        index: dict[Any, int],
+    ) -> None:
+        """Add several items to a list, all or nothing.
+
+        Every key is checked against the list and the rest of the batch before
+        anything is appended, so a duplicate leaves the list unchanged.
+
+        Args:
+            items: The list to add to.
+            new_items: The items to add.
+            key: Function to extract the key from an item for duplicate checking.
+            error_message: Builds the error message for a duplicate item.
+            index: Key -> position index kept in sync with the list.
+
+        Raises:
+            ValueError: If an item's key already exists or repeats in the batch.
+        """
+        new_items = list(new_items)
+        seen: set[Any] = set()
+        for item in new_items:
+            key_value = key(item)
+            if (
+                key_value in seen
+                or self._position(items, key_value, key, index) is not None
+            ):
+                raise ValueError(error_message(item))
+            seen.add(key_value)
+
+        start = len(items)
+        for item in new_items:
+            index[key(item)] = len(items)
+            items.append(item)
+        self._record(partial(items.__delitem__, slice(start, None)))
 
     def _remove_by_key(
         self,
         items: list[T],
         key_value: Any,
         key: Callable[[T], Any],
+        index: dict[Any, int],
     ) -> bool:
-        """Remove items from a list by key value.
+        """Remove the item with the given key value from a list.
 
         Args:
             items: The list to remove from.
             key_value: The key value to match.
             key: Function to extract the key from an item.
+            index: Key -> position index kept in sync with the list.
 
         Returns:
-            True if any items were removed, False otherwise.
+            True if an item was removed, False otherwise.
         """
-        original_length = len(items)
-        items[:] = [item for item in items if key(item) != key_value]
-        return len(items) < original_length
+        i = self._position(items, key_value, key, index)
+        if i is None:
+            return False
+        removed = items.pop(i)
+        self._record(partial(items.insert, i, removed))
+        del index[key_value]
+        for j in range(i, len(items)):
+            index[key(items[j])] = j
+        return True
 
     def _get_by_key(
         self,
         items: list[T],
         key_value: Any,
         key: Callable[[T], Any],
+        index: dict[Any, int],
     ) -> T | None:
         """Get an item from a list by key value.
 
+        Runs without the lock, so a transaction in another thread may be
+        editing the list and the index. The index is only used as a hint: the
+        item it points at is checked, a stale or missing entry falls back to a
+        linear scan, and the index is never written.
+
         Args:
             items: The list to search.
             key_value: The key value to match.
             key: Function to extract the key from an item.
+            index: Key -> position index kept in sync with the list.
 
         Returns:
             The matching item, or None if not found.
         """
+        i = index.get(key_value)
+        if i is not None:
+            try:
+                item = items[i]
+            except IndexError:
+                pass
+            else:
+                if key(item) == key_value:
+                    return item
+
         for item in items:
             if key(item) == key_value:
                 return item
@@ -151,6 +447,7 @@ class ProjectSettings:
         key_value: Any,
         key: Callable[[T], Any],
         update_fn: Callable[[T], T],
+        index: dict[Any, int],
     ) -> bool:
         """Update an item in a list by key value.
 
@@ -159,15 +456,21 @@ class ProjectSettings:
             key_value: The key value to match.
             key: Function to extract the key from an item.
             update_fn: Function to create the updated item from the existing one.
+            index: Key -> position index kept in sync with the list.
 
         Returns:
             True if the item was found and updated, False otherwise.
         """
-        for i, item in enumerate(items):
-            if key(item) == key_value:
-                items[i] = update_fn(item)
-                return True
-        return False
+        i = self._position(items, key_value, key, index)
+        if i is None:
+            return False
+        old = items[i]
+        items[i] = update_fn(old)
+        self._record(partial(items.__setitem__, i, old))
+        if key(items[i]) != key_value:
+            del index[key_value]
+            index[key(items[i])] = i
+        return True
 
     def update(self, **kwargs: Any) -> None:
         """Update project settings with provided keyword arguments.
@@ -191,6 +494,25 @@ class ProjectSettings:
                 constraint,
                 key=lambda c: c.name,
                 error_message=f"Constraint with name '{constraint.name}' already exists.",
+                index=self._constraint_index,
+            )
+
+    def add_constraints(self, constraints: Iterable[Constraint]) -> None:
+        """Add several constraints in one transaction and persist once.
+
+        Thread-safe: reloads latest state, checks for duplicates, adds, then persists.
+
+        Raises:
+            ValueError: If a constraint name already exists or repeats in the
+                batch. No constraint is added in that case.
+        """
+        with self._transaction():
+            self._extend_unique(
+                self.project_snapshot.constraints,
+                constraints,
+                key=lambda c: c.name,
+                error_message=lambda c: f"Constraint with name '{c.name}' already exists.",
+                index=self._constraint_index,
             )
 
     def remove_constraint(self, constraint_name: str) -> bool:
@@ -203,14 +525,28 @@ class ProjectSettings:
                 self.project_snapshot.constraints,
                 constraint_name,
                 key=lambda c: c.name,
+                index=self._constraint_index,
             )
 
+    async def aadd_constraint(self, constraint: Constraint) -> None:
+        """Async version of `add_constraint` that doesn't block the event loop."""
+        await self._run_in_thread(self.add_constraint, constraint)
+
+    async def aadd_constraints(self, constraints: Iterable[Constraint]) -> None:
+        """Async version of `add_constraints` that doesn't block the event loop."""
+        await self._run_in_thread(self.add_constraints, constraints)
+
+    async def aremove_constraint(self, constraint_name: str) -> bool:
+        """Async version of `remove_constraint` that doesn't block the event loop."""
+        return await self._run_in_thread(self.remove_constraint, constraint_name)
+
     def get_constraint_by_name(self, name: str) -> Constraint | None:
         """Get a constraint by its name, or None if not found."""
         return self._get_by_key(
             self.project_snapshot.constraints,
             name,
             key=lambda c: c.name,
+            index=self._constraint_index,
         )
 
     def update_constraint(self, name: str, **kwargs: Any) -> bool:
@@ -223,9 +559,18 @@ class ProjectSettings:
                 self.project_snapshot.constraints,
                 name,
                 key=lambda c: c.name,
-                update_fn=lambda c: c.model_copy(update=kwargs),
+                # Validated rather than model_copy'd, so the new values are
+                # checked and interned like those of any other constraint
+                update_fn=lambda c: Constraint.model_validate(
+                    {**c.model_dump(), **kwargs}
+                ),
+                index=self._constraint_index,
             )
 
+    async def aupdate_constraint(self, name: str, **kwargs: Any) -> bool:
+        """Async version of `update_constraint` that doesn't block the event loop."""
+        return await self._run_in_thread(self.update_constraint, name, **kwargs)
+
     def add_scenario(self, scenario: Scenario) -> None:
         """Add a scenario and persist changes.
 
@@ -240,6 +585,25 @@ class ProjectSettings:
                 scenario,
                 key=lambda s: s.name,
                 error_message=f"Scenario with name '{scenario.name}' already exists.",
+                index=self._scenario_index,
+            )
+
+    def add_scenarios(self, scenarios: Iterable[Scenario]) -> None:
+        """Add several scenarios in one transaction and persist once.
+
+        Thread-safe: reloads latest state, checks for duplicates, adds, then persists.
+
+        Raises:
+            ValueError: If a scenario name already exists or repeats in the
+                batch. No scenario is added in that case.
+        """
+        with self._transaction():
+            self._extend_unique(
+                self.project_snapshot.dataset,
+                scenarios,
+                key=lambda s: s.name,
+                error_message=lambda s: f"Scenario with name '{s.name}' already exists.",
+                index=self._scenario_index,
             )
 
     def remove_scenario(self, scenario_name: str) -> bool:
@@ -252,6 +616,7 @@ class ProjectSettings:
                 self.project_snapshot.dataset,
                 scenario_name,
                 key=lambda s: s.name,
+                index=self._scenario_index,
             )
 
     def get_scenario_by_name(self, name: str) -> Scenario | None:
@@ -260,6 +625,7 @@ class ProjectSettings:
             self.project_snapshot.dataset,
             name,
             key=lambda s: s.name,
+            index=self._scenario_index,
         )
 
     def add_solver_script(self, solver_script: SolverScript) -> None:
@@ -276,6 +642,7 @@ class ProjectSettings:
                 solver_script,
                 key=lambda s: s.name,
                 error_message=f"Solver script with name '{solver_script.name}' already exists.",
+                index=self._solver_script_index,
             )
 
     def remove_solver_script(self, solver_script_name: str) -> bool:
@@ -288,6 +655,7 @@ class ProjectSettings:
                 self.project_snapshot.solver_scripts,
                 solver_script_name,
                 key=lambda s: s.name,
+                index=self._solver_script_index,
             )
 
     def get_solver_script_by_name(self, name: str) -> SolverScript | None:
@@ -296,6 +664,7 @@ class ProjectSettings:
             self.project_snapshot.solver_scripts,
             name,
             key=lambda s: s.name,
+            index=self._solver_script_index,
         )
 
     def add_run(self, run: RunSolverScript) -> None:
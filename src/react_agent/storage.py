@@ -1,37 +1,139 @@
 """File storage abstraction for JSON files."""
 
+import hashlib
 import os
 import tempfile
+import threading
 from pathlib import Path
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, threads are still serialized
+    fcntl = None  # type: ignore[assignment]
+
+
+class DirectoryLock:
+    """Reentrant lock for the files in one directory, across threads and processes.
+
+    Threads are serialized with an RLock. On POSIX, the outermost acquisition
+    also takes an exclusive flock on the directory itself, so other processes
+    using a DirectoryLock on it wait too, without creating a lock file.
+    """
+
+    def __init__(self, directory: Path):
+        """Initialize the lock.
+
+        Args:
+            directory: Directory whose files the lock protects.
+        """
+        self.directory = directory
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: int | None = None
+
+    def __enter__(self) -> "DirectoryLock":
+        """Acquire the lock, blocking until it is available."""
+        self._thread_lock.acquire()
+        try:
+            if self._depth == 0 and fcntl is not None:
+                self._fd = self._lock_directory()
+            self._depth += 1
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Release the lock."""
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            # Closing the descriptor releases the flock
+            fd, self._fd = self._fd, None
+            os.close(fd)
+        self._thread_lock.release()
+
+    def _lock_directory(self) -> int | None:
+        """Open and flock the directory, or return None if it doesn't exist yet."""
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
 
 
 class JsonFileStore:
     """Minimal storage abstraction for JSON file operations."""
 
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, *, durable: bool = True):
         """Initialize the store with a file path.
 
         Args:
             path: Path to the JSON file to store/load.
+            durable: fsync each write so it survives a crash. Writes stay
+                atomic without it, which is enough for throwaway files.
         """
         self.path = path
+        self.durable = durable
+        # (st_mtime_ns, st_ino, st_size) of the file as last loaded or saved by
+        # us. The inode catches atomic replacements that keep mtime and size.
+        self._stamp: tuple[int, int, int] | None = None
+        # Digest of the content we last wrote, if the file still holds it
+        self._digest: bytes | None = None
+
+    def _current_stamp(self) -> tuple[int, int, int] | None:
+        """Return the (mtime, inode, size) stamp of the file, or None if missing."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
 
-    def load(self) -> str | None:
+    def load(self) -> bytes | None:
         """Load content from the file if it exists.
 
         Returns:
-            File content as string, or None if file doesn't exist.
+            Raw file content, or None if file doesn't exist. Bytes are returned
+            as-is since pydantic parses UTF-8 JSON directly.
+        """
+        # One open + fstat instead of exists(), stat() and a second open; the
+        # stamp also describes exactly the content that was read
+        try:
+            with open(self.path, "rb") as f:
+                st = os.fstat(f.fileno())
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        self._stamp = (st.st_mtime_ns, st.st_ino, st.st_size)
+        self._digest = None
+        return content
+
+    def load_if_changed(self) -> bytes | None:
+        """Load content only if the file changed since it was last loaded or saved.
+
+        Returns:
+            Raw file content, or None if the file doesn't exist or is unchanged.
         """
-        if self.path.exists():
-            return self.path.read_text()
-        return None
+        stamp = self._current_stamp()
+        if stamp is None or stamp == self._stamp:
+            return None
+        return self.load()
 
-    def save_atomic(self, content: str) -> None:
-        """Save content to file atomically.
+    def save_atomic(self, content: str | bytes) -> None:
+        """Save content to file atomically and durably.
 
         Performs atomic write by writing to a temporary file first,
         then renaming it to the target file. This ensures the file
-        is either fully written or not modified at all.
+        is either fully written or not modified at all. If the store is
+        durable, the temporary file and the directory are fsynced so the
+        rename survives a crash.
+        The write is skipped if the file still holds exactly this content
+        from our previous save.
 
         Args:
             content: The content to write to the file.
@@ -39,6 +141,11 @@ class JsonFileStore:
         Raises:
             OSError: If the write operation fails.
         """
+        data = content.encode() if isinstance(content, str) else content
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == self._digest and self._current_stamp() == self._stamp:
+            return
+
         # Ensure parent directory exists
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -47,8 +154,16 @@ class JsonFileStore:
             dir=self.path.parent, prefix=".optigen_", suffix=".tmp"
         )
         try:
-            with os.fdopen(fd, "w") as f:
-                f.write(content)
+            # Write bytes straight to the raw fd, bypassing the text io stack;
+            # a memoryview lets partial writes resume without copying the tail
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view) :]
+                if self.durable:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
             # os.replace is atomic on POSIX systems
             os.replace(tmp_path, self.path)
         except Exception:
@@ -58,3 +173,25 @@ class JsonFileStore:
             except OSError:
                 pass
             raise
+        if self.durable:
+            try:
+                self._fsync_directory()
+            except BaseException:
+                # The new content is already in place, but the caller treats
+                # the save as failed; forget the stamp so the next
+                # load_if_changed reads the file back instead of trusting memory
+                self._stamp = None
+                self._digest = None
+                raise
+        self._stamp = self._current_stamp()
+        self._digest = digest
+
+    def _fsync_directory(self) -> None:
+        """Flush the parent directory entry so a rename is durable (POSIX only)."""
+        if os.name != "posix":
+            return
+        dir_fd = os.open(self.path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
@@ -1,15 +1,20 @@
 """Define tools available to the agent for problem specification and search."""
 
+import asyncio
+import functools
 import json
+import os
 import subprocess
 import sys
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Literal, Optional, cast
+from typing import TYPE_CHECKING, Any, Literal, Optional, cast
 
-from langchain_tavily import TavilySearch
 from langgraph.runtime import get_runtime
 
 from react_agent.context import Context
+from react_agent.project_snapshot import ProjectSettings
 from react_agent.types import (
     Constraint,
     RunSolverScript,
@@ -18,6 +23,60 @@ from react_agent.types import (
     UserAPISchemaDefinition,
 )
 
+if TYPE_CHECKING:
+    from langchain_tavily import TavilySearch
+
+_NOT_INITIALIZED = "Error: Project settings not initialized."
+
+
+def _get_project_settings() -> Optional[ProjectSettings]:
+    """Return the project settings of the current graph run, if any.
+
+    The runtime is bound to each graph invocation, so it is looked up per
+    call rather than cached at module level.
+    """
+    return get_runtime(Context).context.project_settings
+
+
+@functools.lru_cache(maxsize=4)
+def _tavily(max_results: int) -> "TavilySearch":
+    """Return a shared TavilySearch tool for the given result count.
+
+    The tool holds no per-request state, so one instance per setting is
+    reused instead of validating and configuring a new one on every search.
+    """
+    # Imported on first search; langchain_tavily pulls in aiohttp and requests
+    from langchain_tavily import TavilySearch
+
+    return TavilySearch(max_results=max_results)
+
+
+# Search results by (query, max_results), oldest first; entries expire after
+# the TTL so long sessions still see fresh results
+_SEARCH_CACHE_SIZE = 128
+_SEARCH_CACHE_TTL_S = 600.0
+_search_cache: OrderedDict[tuple[str, int], tuple[float, dict[str, Any]]] = (
+    OrderedDict()
+)
+
+
+async def _cached_search(query: str, max_results: int) -> dict[str, Any]:
+    """Run a Tavily search, reusing the result of a recent identical query."""
+    key = (query, max_results)
+    cached = _search_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _SEARCH_CACHE_TTL_S:
+        _search_cache.move_to_end(key)
+        return cached[1]
+
+    result = cast(dict[str, Any], await _tavily(max_results).ainvoke({"query": query}))
+    # TavilySearch reports failures as {"error": ...}; those are worth retrying
+    if "error" not in result:
+        _search_cache[key] = (time.monotonic(), result)
+        _search_cache.move_to_end(key)
+        if len(_search_cache) > _SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+    return result
+
 
 async def search(query: str) -> Optional[dict[str, Any]]:
     """Search for general web results.
@@ -27,8 +86,49 @@ async def search(query: str) -> Optional[dict[str, Any]]:
     for answering questions about current events.
     """
     runtime = get_runtime(Context)
-    wrapped = TavilySearch(max_results=runtime.context.max_search_results)
-    return cast(dict[str, Any], await wrapped.ainvoke({"query": query}))
+    return await _cached_search(query, runtime.context.max_search_results)
+
+
+async def batch_search(queries: list[str]) -> list[dict[str, Any]]:
+    """Run several independent web searches concurrently.
+
+    Prefer this over repeated `search` calls when you have multiple
+    questions that don't depend on each other's answers.
+
+    Args:
+        queries: The search queries to run
+
+    Returns:
+        One result per query, in the same order. A query that failed
+        returns a dict with the query and an "error" message instead.
+    """
+    runtime = get_runtime(Context)
+    max_results = runtime.context.max_search_results
+    results = await asyncio.gather(
+        *(_cached_search(query, max_results) for query in queries),
+        return_exceptions=True,
+    )
+    output: list[dict[str, Any]] = []
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            output.append({"query": query, "error": str(result)})
+        elif isinstance(result, BaseException):
+            # Cancellation and exits must propagate, not pose as search results
+            raise result
+        else:
+            output.append(result)
+    return output
+
+
+def clear_search_cache() -> str:
+    """Forget recent web search results.
+
+    Repeated `search` and `batch_search` queries are answered from a cache
+    for a few minutes. Clear it when you need fresh results for a query you
+    already ran.
+    """
+    _search_cache.clear()
+    return "Search cache cleared."
 
 
 def read_problem_specification() -> str:
@@ -37,23 +137,23 @@ def read_problem_specification() -> str:
     Returns the project snapshot JSON containing title, description,
     constraints, and schema definitions for the optimization problem.
     """
-    runtime = get_runtime(Context)
-    if (
-        runtime.context.project_settings
-        and runtime.context.project_settings.project_snapshot
-    ):
-        return runtime.context.project_settings.project_snapshot.model_dump_json(
-            indent=2
-        )
+    project_settings = _get_project_settings()
+    if project_settings is not None and project_settings.project_snapshot:
+        return project_settings.snapshot_json()
     return "{}"
 
 
+# Packages installed for solver scripts, reported by available_python_dependencies
+AVAILABLE_PYTHON_DEPENDENCIES: tuple[str, ...] = ("pyomo",)
+_AVAILABLE_PYTHON_DEPENDENCIES_TEXT = " ".join(AVAILABLE_PYTHON_DEPENDENCIES)
+
+
 def available_python_dependencies() -> str:
     """Return a list of available Python dependencies to use in solver scripts."""
-    return "pyomo"
+    return _AVAILABLE_PYTHON_DEPENDENCIES_TEXT
 
 
-def add_constraint(
+async def add_constraint(
     name: str,
     description: str,
     constraint_type: Literal["hard", "soft"],
@@ -88,11 +188,12 @@ def add_constraint(
     Returns:
         Confirmation message with the added constraint details.
     """
-    runtime = get_runtime(Context)
-    if not runtime.context.project_settings:
-        return "Error: Project settings not initialized."
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
 
-    constraint = Constraint(
+    # Arguments were validated against the signature when the tool was invoked
+    constraint = Constraint.model_construct(
         name=name,
         description=description,
         type=constraint_type,
@@ -102,13 +203,41 @@ def add_constraint(
     )
 
     try:
-        runtime.context.project_settings.add_constraint(constraint)
+        await project_settings.aadd_constraint(constraint)
     except ValueError as e:
         return f"Error adding constraint: {e}"
     return f"Successfully added constraint '{name}' ({constraint_type})."
 
 
-def remove_constraint(name: str) -> str:
+async def add_constraints(constraints: list[Constraint]) -> str:
+    """Add several constraints or objectives to the optimization problem at once.
+
+    Prefer this over repeated `add_constraint` calls when several constraints
+    are already known. Each constraint follows the same rules as in
+    `add_constraint`; its `type` is "hard" or "soft". If any name already
+    exists or is repeated, none of the constraints are added.
+
+    Args:
+        constraints: The constraints to add, in order
+
+    Returns:
+        Confirmation message listing the added constraint names.
+    """
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
+    if not constraints:
+        return "No constraints provided."
+
+    try:
+        await project_settings.aadd_constraints(constraints)
+    except ValueError as e:
+        return f"Error adding constraints: {e}"
+    names = ", ".join(f"'{c.name}'" for c in constraints)
+    return f"Successfully added {len(constraints)} constraints: {names}."
+
+
+async def remove_constraint(name: str) -> str:
     """Remove an existing constraint from the optimization problem by its name.
 
     Args:
@@ -117,11 +246,11 @@ def remove_constraint(name: str) -> str:
     Returns:
         Confirmation message indicating whether the constraint was removed.
     """
-    runtime = get_runtime(Context)
-    if not runtime.context.project_settings:
-        return "Error: Project settings not initialized."
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
 
-    removed = runtime.context.project_settings.remove_constraint(name)
+    removed = await project_settings.aremove_constraint(name)
     if removed:
         return f"Successfully removed constraint '{name}'."
     return f"Constraint '{name}' not found."
@@ -142,25 +271,36 @@ def update_project_metadata(
     Returns:
         Confirmation message with the updated metadata.
     """
-    runtime = get_runtime(Context)
-    if not runtime.context.project_settings:
-        return "Error: Project settings not initialized."
-
-    updates = []
-    if title and description:
-        runtime.context.project_settings.update(title=title, description=description)
-        updates.append(f"title='{title}'")
-        updates.append(f"description='{description}'")
-    elif title:
-        runtime.context.project_settings.update(title=title)
-        updates.append(f"title='{title}'")
-    elif description:
-        runtime.context.project_settings.update(description=description)
-        updates.append(f"description='{description}'")
-
-    if updates:
-        return f"Successfully updated project metadata: {', '.join(updates)}."
-    return "No updates provided."
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
+
+    # One update call, so the snapshot is validated and written once
+    updates = {
+        key: value
+        for key, value in (("title", title), ("description", description))
+        if value
+    }
+    if not updates:
+        return "No updates provided."
+
+    project_settings.update(**updates)
+    summary = ", ".join(f"{key}='{value}'" for key, value in updates.items())
+    return f"Successfully updated project metadata: {summary}."
+
+
+def _summarize_schema(schema: dict[str, Any]) -> str:
+    """Describe a schema briefly instead of echoing it back to the model.
+
+    The full schema is available through `read_problem_specification`. Set
+    OPTIGEN_VERBOSE_TOOL_RETURNS=1 to echo the whole schema while debugging.
+    """
+    if os.getenv("OPTIGEN_VERBOSE_TOOL_RETURNS") == "1":
+        return json.dumps(schema, indent=2)
+
+    # Compact dumps runs on the C encoder; indent would force the pure-Python one
+    size = len(json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode())
+    return f"{len(schema)} top-level fields, {size} bytes"
 
 
 def update_request_schema(json_schema: dict[str, Any]) -> str:
@@ -175,22 +315,20 @@ def update_request_schema(json_schema: dict[str, Any]) -> str:
         json_schema: JSON schema dictionary defining the expected input format (OpenAPI format)
 
     Returns:
-        Confirmation message with the updated schema.
+        Confirmation message summarizing the updated schema.
     """
-    runtime = get_runtime(Context)
-    if not runtime.context.project_settings:
-        return "Error: Project settings not initialized."
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
 
-    current_schema_def = (
-        runtime.context.project_settings.project_snapshot.schema_definition
-    )
+    current_schema_def = project_settings.project_snapshot.schema_definition
     response_schema = current_schema_def.response_schema if current_schema_def else {}
 
     new_schema_def = UserAPISchemaDefinition(
         request_schema=json_schema, response_schema=response_schema
     )
-    runtime.context.project_settings.update(schema_definition=new_schema_def)
-    return f"Successfully updated request schema: {json.dumps(json_schema, indent=2)}"
+    project_settings.update(schema_definition=new_schema_def)
+    return f"Successfully updated request schema: {_summarize_schema(json_schema)}."
 
 
 def update_response_schema(json_schema: dict[str, Any]) -> str:
@@ -205,22 +343,20 @@ def update_response_schema(json_schema: dict[str, Any]) -> str:
         json_schema: JSON schema dictionary defining the expected output format (OpenAPI format)
 
     Returns:
-        Confirmation message with the updated schema.
+        Confirmation message summarizing the updated schema.
     """
-    runtime = get_runtime(Context)
-    if not runtime.context.project_settings:
-        return "Error: Project settings not initialized."
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
 
-    current_schema_def = (
-        runtime.context.project_settings.project_snapshot.schema_definition
-    )
+    current_schema_def = project_settings.project_snapshot.schema_definition
     request_schema = current_schema_def.request_schema if current_schema_def else {}
 
     new_schema_def = UserAPISchemaDefinition(
         request_schema=request_schema, response_schema=json_schema
     )
-    runtime.context.project_settings.update(schema_definition=new_schema_def)
-    return f"Successfully updated response schema: {json.dumps(json_schema, indent=2)}"
+    project_settings.update(schema_definition=new_schema_def)
+    return f"Successfully updated response schema: {_summarize_schema(json_schema)}."
 
 
 def add_scenario(
@@ -242,16 +378,17 @@ def add_scenario(
     Returns:
         Confirmation message with the added scenario details.
     """
-    runtime = get_runtime(Context)
-    if not runtime.context.project_settings:
-        return "Error: Project settings not initialized."
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
 
-    scenario = Scenario(
+    # Arguments were validated against the signature when the tool was invoked
+    scenario = Scenario.model_construct(
         name=name,
         description=description,
         request=Path(request_path),
     )
-    runtime.context.project_settings.add_scenario(scenario)
+    project_settings.add_scenario(scenario)
 
     scenario_id = f"'{name}'" if name else "unnamed scenario"
     return (
@@ -271,11 +408,11 @@ def remove_scenario(scenario_name: str) -> str:
     Returns:
         Confirmation message indicating whether the scenario was removed.
     """
-    runtime = get_runtime(Context)
-    if not runtime.context.project_settings:
-        return "Error: Project settings not initialized."
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
 
-    removed = runtime.context.project_settings.remove_scenario(scenario_name)
+    removed = project_settings.remove_scenario(scenario_name)
     if removed:
         return f"Successfully removed scenario '{scenario_name}'."
     return f"Scenario '{scenario_name}' not found."
@@ -298,9 +435,9 @@ def add_solver_script(
     Returns:
         Confirmation message with the added solver script details.
     """
-    runtime = get_runtime(Context)
-    if not runtime.context.project_settings:
-        return "Error: Project settings not initialized."
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
 
     solver_script = SolverScript(
         name=name,
@@ -308,7 +445,7 @@ def add_solver_script(
     )
 
     try:
-        runtime.context.project_settings.add_solver_script(solver_script)
+        project_settings.add_solver_script(solver_script)
     except ValueError as e:
         return f"Error adding solver script: {e}"
 
@@ -328,11 +465,11 @@ def remove_solver_script(solver_script_name: str) -> str:
     Returns:
         Confirmation message indicating whether the solver script was removed.
     """
-    runtime = get_runtime(Context)
-    if not runtime.context.project_settings:
-        return "Error: Project settings not initialized."
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
 
-    removed = runtime.context.project_settings.remove_solver_script(solver_script_name)
+    removed = project_settings.remove_solver_script(solver_script_name)
     if removed:
         return f"Successfully removed solver script '{solver_script_name}'."
     return f"Solver script '{solver_script_name}' not found."
@@ -361,14 +498,12 @@ def run(
     Returns:
         Confirmation message with the run details.
     """
-    runtime = get_runtime(Context)
-    if not runtime.context.project_settings:
-        return "Error: Project settings not initialized."
+    project_settings = _get_project_settings()
+    if project_settings is None:
+        return _NOT_INITIALIZED
 
     # Find the solver script
-    solver = runtime.context.project_settings.get_solver_script_by_name(
-        solver_script_name
-    )
+    solver = project_settings.get_solver_script_by_name(solver_script_name)
     if not solver:
         return f"Error: Solver script '{solver_script_name}' not found."
 
@@ -378,7 +513,7 @@ def run(
         )
 
     # Resolve paths
-    project_dir = runtime.context.project_settings.directory
+    project_dir = project_settings.directory
     script_full_path = project_dir / solver.script
     input_full_path = project_dir / path_to_input_file
     output_full_path = project_dir / path_to_output_file
@@ -436,9 +571,11 @@ def run(
     )
 
     try:
-        runtime.context.project_settings.add_run(run_record)
+        project_settings.add_run(run_record)
     except ValueError as e:
         return f"Error recording run: {e}"
+    # A completed run ends a solver step; write out any deferred changes
+    project_settings.flush()
 
     log_path = Path(path_to_output_file).with_suffix(".log")
     return f"Successfully ran solver '{solver_script_name}' with input '{path_to_input_file}' and saved output to '{path_to_output_file}'. Log file saved to '{log_path}'."
@@ -1,15 +1,22 @@
 """Define project snapshot models for optimization problem specifications."""
 
+import sys
 from collections.abc import Mapping
 from pathlib import Path
 from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Strings up to this length are interned; longer ones are mostly unique formulas
+_INTERN_MAX_LEN = 64
 
 
 class Constraint(BaseModel):
     """Represents a constraint or objective in an optimization problem."""
 
+    # Immutable so snapshots can share instances; build a new one to change it
+    model_config = ConfigDict(frozen=True)
+
     name: str
     description: str
     type: Literal["hard", "soft"]
@@ -17,10 +24,26 @@ class Constraint(BaseModel):
     formula: str = ""
     where: str = ""
 
+    def model_post_init(self, context: Any) -> None:
+        """Intern short strings such as types and `where` clauses, which repeat a lot.
+
+        Unlike a field validator this also runs for `model_construct`.
+        """
+        for field in ("name", "type", "formula", "where"):
+            value = self.__dict__.get(field)
+            if type(value) is str and len(value) <= _INTERN_MAX_LEN:
+                self.__dict__[field] = sys.intern(value)
+
+    def __hash__(self) -> int:
+        """Hash by name, which is unique within a project and consistent with `==`."""
+        return hash(self.name)
+
 
 class UserAPISchemaDefinition(BaseModel):
     """Defines the request and response schemas for the user API."""
 
+    model_config = ConfigDict(frozen=True)
+
     request_schema: Mapping[str, Any]
     response_schema: Mapping[str, Any]
 
@@ -28,6 +51,8 @@ class UserAPISchemaDefinition(BaseModel):
 class Scenario(BaseModel):
     """Represents a scenario in the optimization problem."""
 
+    model_config = ConfigDict(frozen=True)
+
     name: str
     description: str = ""
     request: Path
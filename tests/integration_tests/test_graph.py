@@ -1,3 +1,6 @@
+import uuid
+from typing import Any
+
 import pytest
 
 from react_agent.context import Context
@@ -6,10 +9,16 @@ from react_agent.graph import create_graph
 pytestmark = pytest.mark.anyio
 
 
-async def test_react_agent_simple_passthrough() -> None:
-    graph = await create_graph()
-    res = await graph.ainvoke(
+@pytest.fixture(scope="session")
+async def compiled_graph() -> Any:
+    """Build the graph once per session; tests isolate state by thread id."""
+    return await create_graph()
+
+
+async def test_react_agent_simple_passthrough(compiled_graph: Any) -> None:
+    res = await compiled_graph.ainvoke(
         {"messages": [("user", "What is your name?")]},
+        {"configurable": {"thread_id": str(uuid.uuid4())}},
         context=Context(),
     )
 
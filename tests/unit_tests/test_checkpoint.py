@@ -0,0 +1,62 @@
+from typing import Any, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from react_agent.checkpoint import BoundedInMemorySaver
+
+
+class State(TypedDict):
+    count: int
+
+
+def build_graph(saver: BoundedInMemorySaver) -> Any:
+    builder = StateGraph(State)
+    builder.add_node("step", lambda state: {"count": state["count"] + 1})
+    builder.add_edge(START, "step")
+    builder.add_edge("step", END)
+    return builder.compile(checkpointer=saver)
+
+
+def test_history_is_bounded_per_thread() -> None:
+    saver = BoundedInMemorySaver(max_checkpoints=4)
+    graph = build_graph(saver)
+    config = {"configurable": {"thread_id": "t1"}}
+
+    for i in range(10):
+        result = graph.invoke({"count": i}, config)
+        assert result["count"] == i + 1
+
+    retained = list(saver.list(config))
+    assert len(retained) == 4
+    assert graph.get_state(config).values["count"] == 10
+
+    # Only blobs referenced by retained checkpoints are kept
+    referenced = {
+        ("t1", "", channel, version)
+        for t in retained
+        for channel, version in t.checkpoint["channel_versions"].items()
+    }
+    assert set(saver.blobs) <= referenced
+
+
+def test_threads_are_bounded_independently() -> None:
+    saver = BoundedInMemorySaver(max_checkpoints=3)
+    graph = build_graph(saver)
+
+    for thread_id in ("a", "b"):
+        for i in range(5):
+            graph.invoke({"count": i}, {"configurable": {"thread_id": thread_id}})
+
+    for thread_id in ("a", "b"):
+        config = {"configurable": {"thread_id": thread_id}}
+        assert len(list(saver.list(config))) == 3
+
+    saver.delete_thread("a")
+    assert not list(saver.list({"configurable": {"thread_id": "a"}}))
+    assert all(key[0] == "b" for key in saver.blobs)
+
+
+def test_rejects_non_positive_limit() -> None:
+    with pytest.raises(ValueError):
+        BoundedInMemorySaver(max_checkpoints=0)
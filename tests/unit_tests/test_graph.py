@@ -0,0 +1,42 @@
+from collections.abc import Iterator
+
+import langchain.chat_models
+import pytest
+
+from react_agent import graph
+
+
+@pytest.fixture(autouse=True)
+def clean_model_cache() -> Iterator[None]:
+    graph.clear_chat_model_cache()
+    yield
+    graph.clear_chat_model_cache()
+
+
+def test_chat_models_are_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    created: list[str] = []
+
+    def fake_init_chat_model(model_str: str) -> object:
+        created.append(model_str)
+        return object()
+
+    monkeypatch.setattr(langchain.chat_models, "init_chat_model", fake_init_chat_model)
+
+    first = graph._get_chat_model("openai:gpt-4o-mini")
+    assert graph._get_chat_model("openai:gpt-4o-mini") is first
+    assert graph._get_chat_model("anthropic:claude") is not first
+    assert created == ["openai:gpt-4o-mini", "anthropic:claude"]
+
+
+def test_subagents_are_cached_by_tool_identity() -> None:
+    def extra_tool() -> str:
+        """Extra tool."""
+        return ""
+
+    assert graph.get_subagents() is graph.get_subagents()
+    assert graph.get_subagents([extra_tool]) is graph.get_subagents([extra_tool])
+    assert graph.get_subagents([extra_tool]) is not graph.get_subagents()
+
+    solver = graph.get_subagents([extra_tool])[-1]
+    assert solver["name"] == "solver_coder"
+    assert extra_tool in solver["tools"]
@@ -0,0 +1,136 @@
+import asyncio
+import importlib
+from collections.abc import Iterator
+from typing import Any
+
+import langchain_mcp_adapters.client
+import pytest
+
+from react_agent import mcp
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClient:
+    instances = 0
+    delay = 0.0
+
+    def __init__(self, connections: dict[str, Any]) -> None:
+        FakeClient.instances += 1
+        self.connections = connections
+
+    async def get_tools(self, *, server_name: str | None = None) -> list[str]:
+        if FakeClient.delay:
+            await asyncio.sleep(FakeClient.delay)
+        return ["resolve-library-id", "get-library-docs"]
+
+
+@pytest.fixture(autouse=True)
+def fake_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    FakeClient.instances = 0
+    FakeClient.delay = 0.0
+    monkeypatch.setattr(
+        langchain_mcp_adapters.client, "MultiServerMCPClient", FakeClient
+    )
+    monkeypatch.setattr(mcp.shutil, "which", lambda cmd: f"/usr/bin/{cmd}")
+    mcp.invalidate_mcp_cache()
+    yield
+    mcp.invalidate_mcp_cache()
+
+
+async def test_disabled_without_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("CONTEXT7_API_KEY", raising=False)
+    assert await mcp.get_mcp_tools() == []
+    assert FakeClient.instances == 0
+
+
+async def test_disabled_without_npx(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CONTEXT7_API_KEY", "key")
+    monkeypatch.setattr(mcp.shutil, "which", lambda cmd: None)
+    assert await mcp.get_mcp_tools() == []
+    assert FakeClient.instances == 0
+
+
+async def test_missing_npx_is_checked_and_reported_once(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setenv("CONTEXT7_API_KEY", "key")
+    lookups: list[str] = []
+
+    def which(cmd: str) -> None:
+        lookups.append(cmd)
+
+    monkeypatch.setattr(mcp.shutil, "which", which)
+    for _ in range(3):
+        assert await mcp.get_mcp_tools() == []
+
+    assert lookups == ["npx"]
+    assert caplog.text.count("npx is not installed") == 1
+
+
+async def test_cached_tools_skip_the_npx_lookup(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("CONTEXT7_API_KEY", "key")
+    lookups: list[str] = []
+
+    def which(cmd: str) -> str:
+        lookups.append(cmd)
+        return f"/usr/bin/{cmd}"
+
+    monkeypatch.setattr(mcp.shutil, "which", which)
+    for _ in range(5):
+        await mcp.get_mcp_tools()
+
+    assert lookups == ["npx"]
+
+
+async def test_tools_are_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CONTEXT7_API_KEY", "key")
+
+    first = await mcp.get_mcp_tools()
+    second = await mcp.get_mcp_tools()
+
+    assert first == ["resolve-library-id", "get-library-docs"]
+    assert second is first
+    assert FakeClient.instances == 1
+
+    mcp.invalidate_mcp_cache()
+    await mcp.get_mcp_tools()
+    assert FakeClient.instances == 2
+
+
+async def test_slow_server_is_skipped_and_not_cached(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setenv("CONTEXT7_API_KEY", "key")
+    monkeypatch.setenv("CONTEXT7_TIMEOUT_S", "0.01")
+    FakeClient.delay = 1.0
+
+    assert await mcp.get_mcp_tools() == []
+    assert "Failed to load context7 MCP tools" in caplog.text
+
+    FakeClient.delay = 0.0
+    assert await mcp.get_mcp_tools() == ["resolve-library-id", "get-library-docs"]
+
+
+async def test_get_mcp_tools_uses_prewarmed_result(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("CONTEXT7_API_KEY", "key")
+
+    mcp.prewarm_mcp_tools()
+    assert mcp._mcp_prewarm is not None
+    mcp._mcp_prewarm.result(timeout=5)
+
+    assert await mcp.get_mcp_tools() == ["resolve-library-id", "get-library-docs"]
+    assert FakeClient.instances == 1
+
+
+def test_import_does_not_prewarm(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CONTEXT7_API_KEY", "key")
+
+    importlib.reload(mcp)
+
+    assert mcp._mcp_prewarm is None
+    assert FakeClient.instances == 0
@@ -1,8 +1,16 @@
+import gc
 import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import pytest
+from pydantic import ValidationError
 
+from react_agent import storage
 from react_agent.project_snapshot import ProjectSettings
 from react_agent.types import (
     Constraint,
@@ -22,7 +30,7 @@ def project_dir(tmp_path: Path) -> Path:
 
 @pytest.fixture
 def project_settings(project_dir: Path) -> ProjectSettings:
-    return ProjectSettings(project_dir)
+    return ProjectSettings(project_dir, durable=False)
 
 
 def test_initialization_creates_file(project_dir: Path) -> None:
@@ -63,6 +71,95 @@ def test_add_constraint_duplicate_error(project_settings: ProjectSettings) -> No
         project_settings.add_constraint(c)
 
 
+def test_add_constraints_is_all_or_nothing(
+    project_settings: ProjectSettings, project_dir: Path
+) -> None:
+    project_settings.add_constraints(
+        [
+            Constraint(name="c1", description="desc", type="hard"),
+            Constraint(name="c2", description="desc", type="soft", rank=1),
+        ]
+    )
+    content = json.loads((project_dir / "optigen.json").read_text())
+    assert [c["name"] for c in content["constraints"]] == ["c1", "c2"]
+
+    with pytest.raises(ValueError, match="Constraint with name 'c2' already exists"):
+        project_settings.add_constraints(
+            [
+                Constraint(name="c3", description="desc", type="hard"),
+                Constraint(name="c2", description="desc", type="hard"),
+            ]
+        )
+    assert project_settings.get_constraint_by_name("c3") is None
+    assert len(project_settings.project_snapshot.constraints) == 2
+
+
+def test_noop_mutations_do_not_write(
+    project_settings: ProjectSettings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    project_settings.add_constraint(Constraint(name="c1", description="d", type="hard"))
+    version = project_settings._version
+
+    def failing_save(content: str | bytes) -> None:
+        raise AssertionError("unexpected write")
+
+    monkeypatch.setattr(project_settings.store, "save_atomic", failing_save)
+    assert not project_settings.remove_constraint("missing")
+    assert not project_settings.remove_scenario("missing")
+    assert not project_settings.update_constraint("missing", description="x")
+    assert project_settings._version == version
+
+
+def test_failed_write_rolls_back_memory(
+    project_settings: ProjectSettings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    for name in ("c1", "c2", "c3"):
+        project_settings.add_constraint(
+            Constraint(name=name, description="d", type="hard")
+        )
+    before = project_settings.project_snapshot.model_dump()
+
+    def failing_save(content: str | bytes) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(project_settings.store, "save_atomic", failing_save)
+    with pytest.raises(OSError):
+        project_settings.add_constraint(
+            Constraint(name="c4", description="d", type="hard")
+        )
+    with pytest.raises(OSError):
+        project_settings.remove_constraint("c2")
+    with pytest.raises(OSError):
+        project_settings.update_constraint("c3", description="changed")
+    with pytest.raises(OSError):
+        project_settings.update(title="changed")
+
+    assert project_settings.project_snapshot.model_dump() == before
+    assert project_settings.get_constraint_by_name("c4") is None
+    c2 = project_settings.get_constraint_by_name("c2")
+    assert c2 is not None and c2.name == "c2"
+
+
+def test_failure_after_rename_reloads_before_next_write(
+    project_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    settings = ProjectSettings(project_dir)
+    settings.add_constraint(Constraint(name="a", description="d", type="hard"))
+
+    def failing_fsync() -> None:
+        raise OSError("fsync failed")
+
+    # The new file is already renamed into place when the directory fsync fails
+    monkeypatch.setattr(settings.store, "_fsync_directory", failing_fsync)
+    with pytest.raises(OSError):
+        settings.add_constraint(Constraint(name="b", description="d", type="hard"))
+    monkeypatch.undo()
+
+    settings.add_constraint(Constraint(name="c", description="d", type="hard"))
+    content = json.loads((project_dir / "optigen.json").read_text())
+    assert [c["name"] for c in content["constraints"]] == ["a", "b", "c"]
+
+
 def test_update_constraint(project_settings: ProjectSettings) -> None:
     c = Constraint(name="c1", description="desc", type="hard")
     project_settings.add_constraint(c)
@@ -139,3 +236,440 @@ def test_scenario_operations(project_settings: ProjectSettings) -> None:
 
     project_settings.remove_scenario("s1")
     assert project_settings.get_scenario_by_name("s1") is None
+
+
+def test_constraint_index_tracks_mutations(project_settings: ProjectSettings) -> None:
+    for name in ("c1", "c2", "c3"):
+        project_settings.add_constraint(
+            Constraint(name=name, description="desc", type="hard")
+        )
+
+    assert project_settings.remove_constraint("c1")
+    c3 = project_settings.get_constraint_by_name("c3")
+    assert c3 is not None and c3.name == "c3"
+
+    assert project_settings.update_constraint("c2", description="updated")
+    c2 = project_settings.get_constraint_by_name("c2")
+    assert c2 is not None and c2.description == "updated"
+
+
+def test_scenario_index_tracks_mutations(project_settings: ProjectSettings) -> None:
+    for name in ("s1", "s2", "s3"):
+        project_settings.add_scenario(Scenario(name=name, request=Path(f"{name}.json")))
+
+    assert project_settings.remove_scenario("s1")
+    s3 = project_settings.get_scenario_by_name("s3")
+    assert s3 is not None and s3.request == Path("s3.json")
+    with pytest.raises(ValueError, match="Scenario with name 's2' already exists"):
+        project_settings.add_scenario(Scenario(name="s2", request=Path("x.json")))
+
+
+def test_solver_script_index_tracks_mutations(
+    project_settings: ProjectSettings,
+) -> None:
+    for name in ("a", "b", "c"):
+        project_settings.add_solver_script(
+            SolverScript(name=name, script=Path(f"scripts/{name}.py"))
+        )
+
+    assert project_settings.remove_solver_script("a")
+    assert not project_settings.remove_solver_script("a")
+    c = project_settings.get_solver_script_by_name("c")
+    assert c is not None and c.script == Path("scripts/c.py")
+    with pytest.raises(ValueError, match="Solver script with name 'b' already exists"):
+        project_settings.add_solver_script(SolverScript(name="b", script=Path("b.py")))
+
+
+def test_constraint_index_recovers_from_direct_list_edits(
+    project_settings: ProjectSettings,
+) -> None:
+    project_settings.add_constraint(Constraint(name="c1", description="d", type="hard"))
+
+    constraints = project_settings.project_snapshot.constraints
+    constraints.insert(0, Constraint(name="c0", description="d", type="soft"))
+
+    c1 = project_settings.get_constraint_by_name("c1")
+    assert c1 is not None and c1.name == "c1"
+    assert project_settings.get_constraint_by_name("c0") is constraints[0]
+
+
+def test_transaction_skips_reload_when_file_unchanged(
+    project_settings: ProjectSettings,
+) -> None:
+    project_settings.add_constraint(Constraint(name="c1", description="d", type="hard"))
+    snapshot = project_settings.project_snapshot
+
+    project_settings.add_constraint(Constraint(name="c2", description="d", type="hard"))
+
+    # The file was last written by us, so it was not parsed again
+    assert project_settings.project_snapshot is snapshot
+    assert [c.name for c in snapshot.constraints] == ["c1", "c2"]
+
+
+def test_reload_detects_replacement_with_same_mtime_and_size(
+    project_settings: ProjectSettings, project_dir: Path
+) -> None:
+    project_settings.update(title="aaaa")
+    settings_file = project_dir / "optigen.json"
+    st = settings_file.stat()
+
+    # Atomically replace the file, keeping its size and mtime
+    replacement = project_dir / "replacement.json"
+    replacement.write_text(settings_file.read_text().replace("aaaa", "bbbb"))
+    os.utime(replacement, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(replacement, settings_file)
+
+    project_settings.update(description="d")
+    assert project_settings.project_snapshot.title == "bbbb"
+
+
+def test_deferred_mode_writes_on_flush(project_dir: Path) -> None:
+    settings = ProjectSettings(project_dir, persist_mode="deferred")
+    settings.add_constraint(Constraint(name="c1", description="d", type="hard"))
+    settings.add_constraint(Constraint(name="c2", description="d", type="soft"))
+
+    settings_file = project_dir / "optigen.json"
+    assert not settings_file.exists()
+
+    settings.flush()
+    content = json.loads(settings_file.read_text())
+    assert [c["name"] for c in content["constraints"]] == ["c1", "c2"]
+
+
+def test_deferred_session_is_flushed_on_exit(project_dir: Path) -> None:
+    with ProjectSettings(project_dir, persist_mode="deferred") as settings:
+        settings.add_constraint(Constraint(name="c1", description="d", type="hard"))
+        settings.update(title="t")
+
+    reloaded = ProjectSettings(project_dir)
+    assert reloaded.project_snapshot.title == "t"
+    assert reloaded.get_constraint_by_name("c1") is not None
+
+
+@pytest.mark.anyio
+async def test_deferred_session_is_flushed_on_async_exit(project_dir: Path) -> None:
+    async with ProjectSettings(project_dir, persist_mode="deferred") as settings:
+        settings.add_scenario(Scenario(name="s1", request=Path("s1.json")))
+
+    assert ProjectSettings(project_dir).get_scenario_by_name("s1") is not None
+
+
+def test_batch_writes_once(
+    project_settings: ProjectSettings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    writes: list[str | bytes] = []
+    save_atomic = project_settings.store.save_atomic
+
+    def counting_save(content: str | bytes) -> None:
+        writes.append(content)
+        save_atomic(content)
+
+    monkeypatch.setattr(project_settings.store, "save_atomic", counting_save)
+
+    with project_settings.batch():
+        for i in range(5):
+            project_settings.add_constraint(
+                Constraint(name=f"c{i}", description="d", type="hard")
+            )
+        with project_settings.batch():
+            project_settings.remove_constraint("c0")
+        assert writes == []
+
+    assert len(writes) == 1
+    content = json.loads(project_settings.store.path.read_text())
+    assert [c["name"] for c in content["constraints"]] == ["c1", "c2", "c3", "c4"]
+
+
+def test_batch_keeps_writes_from_other_instances(
+    project_settings: ProjectSettings, project_dir: Path
+) -> None:
+    other = ProjectSettings(project_dir, durable=False)
+    writer = threading.Thread(
+        target=other.add_constraint,
+        args=(Constraint(name="c2", description="d", type="hard"),),
+    )
+
+    with project_settings.batch():
+        project_settings.add_constraint(
+            Constraint(name="c1", description="d", type="hard")
+        )
+        writer.start()
+        writer.join(timeout=0.2)
+        # The other instance waits for the batch instead of writing under it
+        assert writer.is_alive()
+    writer.join()
+
+    content = json.loads((project_dir / "optigen.json").read_text())
+    assert sorted(c["name"] for c in content["constraints"]) == ["c1", "c2"]
+
+
+@pytest.mark.anyio
+async def test_async_methods_are_rejected_inside_batch(
+    project_settings: ProjectSettings,
+) -> None:
+    c1 = Constraint(name="c1", description="d", type="hard")
+    with project_settings.batch():
+        # Awaiting would deadlock: the worker thread waits for the batch's lock
+        with pytest.raises(RuntimeError, match="batch"):
+            await project_settings.aadd_constraint(c1)
+        project_settings.add_constraint(c1)
+
+    assert await project_settings.aremove_constraint("c1")
+
+
+def test_pretty_flag_controls_indentation(project_dir: Path) -> None:
+    settings_file = project_dir / "optigen.json"
+
+    ProjectSettings(project_dir).persist_settings()
+    assert "\n" not in settings_file.read_text()
+
+    ProjectSettings(project_dir, pretty=True).persist_settings()
+    assert settings_file.read_text().startswith('{\n  "')
+
+
+def test_durable_flag_controls_fsync(
+    project_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    synced: list[int] = []
+    monkeypatch.setattr(storage.os, "fsync", synced.append)
+
+    ProjectSettings(project_dir, durable=False).persist_settings()
+    assert synced == []
+
+    ProjectSettings(project_dir).update(title="Durable")
+    assert len(synced) == 2  # the temporary file and its directory
+
+
+def test_lock_is_shared_per_settings_file(project_dir: Path, tmp_path: Path) -> None:
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+
+    assert ProjectSettings(project_dir)._lock is ProjectSettings(project_dir)._lock
+    assert ProjectSettings(project_dir)._lock is not ProjectSettings(other_dir)._lock
+
+
+def test_lock_is_dropped_with_last_instance(project_dir: Path) -> None:
+    settings = ProjectSettings(project_dir)
+    assert project_dir.resolve() in ProjectSettings._locks
+
+    del settings
+    gc.collect()
+    assert project_dir.resolve() not in ProjectSettings._locks
+
+
+@pytest.mark.skipif(os.name != "posix", reason="flock is POSIX only")
+def test_lock_excludes_other_processes(project_dir: Path) -> None:
+    probe = (
+        "import fcntl, os, sys\n"
+        "fd = os.open(sys.argv[1], os.O_RDONLY)\n"
+        "try:\n"
+        "    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+        "except BlockingIOError:\n"
+        "    sys.exit(1)\n"
+    )
+
+    def probe_can_lock() -> bool:
+        args = [sys.executable, "-c", probe, str(project_dir)]
+        return subprocess.run(args).returncode == 0
+
+    settings = ProjectSettings(project_dir)
+    with settings._lock:
+        assert not probe_can_lock()
+    assert probe_can_lock()
+
+
+def test_concurrent_batch_adds_no_lost_updates(project_dir: Path) -> None:
+    num_threads, per_thread = 4, 5
+
+    def add_constraints(thread: int) -> None:
+        # Separate instances share the per-file lock and reload each other's writes
+        settings = ProjectSettings(project_dir, durable=False)
+        settings.add_constraints(
+            Constraint(name=f"t{thread}_c{i}", description="d", type="hard")
+            for i in range(per_thread)
+        )
+        settings.add_scenarios(
+            Scenario(name=f"t{thread}_s{i}", request=Path("r.json"))
+            for i in range(per_thread)
+        )
+
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        list(executor.map(add_constraints, range(num_threads)))
+
+    snapshot = ProjectSettings(project_dir).project_snapshot
+    assert len({c.name for c in snapshot.constraints}) == num_threads * per_thread
+    assert len({s.name for s in snapshot.dataset}) == num_threads * per_thread
+
+
+def test_concurrent_mixed_operations(project_settings: ProjectSettings) -> None:
+    for i in range(4):
+        project_settings.add_constraint(
+            Constraint(name=f"c{i}", description="d", type="hard")
+        )
+
+    def update(i: int) -> None:
+        assert project_settings.update_constraint(f"c{i}", description=f"u{i}")
+
+    def remove(i: int) -> None:
+        assert project_settings.remove_constraint(f"c{i}")
+
+    def add(i: int) -> None:
+        project_settings.add_scenario(Scenario(name=f"s{i}", request=Path("r.json")))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(update, i) for i in (0, 1)]
+        futures += [executor.submit(remove, i) for i in (2, 3)]
+        futures += [executor.submit(add, i) for i in range(4)]
+        for future in as_completed(futures):
+            future.result()
+
+    # Persistence across instances is covered by the batch test above
+    snapshot = project_settings.project_snapshot
+    assert [(c.name, c.description) for c in snapshot.constraints] == [
+        ("c0", "u0"),
+        ("c1", "u1"),
+    ]
+    assert sorted(s.name for s in snapshot.dataset) == ["s0", "s1", "s2", "s3"]
+
+
+def test_lookup_does_not_touch_index_mid_edit(
+    project_settings: ProjectSettings,
+) -> None:
+    project_settings.add_constraints(
+        Constraint(name=f"c{i}", description="d", type="hard") for i in range(3)
+    )
+    # The state a reader sees while remove_constraint("c0") is half done
+    project_settings.project_snapshot.constraints.pop(0)
+    index = dict(project_settings._constraint_index)
+
+    assert project_settings.get_constraint_by_name("c0") is None
+    c2 = project_settings.get_constraint_by_name("c2")
+    assert c2 is not None and c2.name == "c2"
+    assert project_settings._constraint_index == index
+
+
+def test_concurrent_lookups_during_writes(project_settings: ProjectSettings) -> None:
+    names = [f"c{i}" for i in range(8)]
+    done = threading.Event()
+
+    def write() -> None:
+        try:
+            for _ in range(10):
+                project_settings.add_constraints(
+                    Constraint(name=name, description="d", type="hard")
+                    for name in names
+                )
+                for name in names:
+                    project_settings.remove_constraint(name)
+        finally:
+            done.set()
+
+    def read() -> None:
+        while not done.is_set():
+            for name in names:
+                c = project_settings.get_constraint_by_name(name)
+                assert c is None or c.name == name
+
+    # Switch threads often so readers land in the middle of a list edit
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(read) for _ in range(3)]
+            futures.append(executor.submit(write))
+            for future in as_completed(futures):
+                future.result()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+
+@pytest.mark.anyio
+async def test_async_constraint_operations(project_settings: ProjectSettings) -> None:
+    await project_settings.aadd_constraint(
+        Constraint(name="c1", description="d", type="hard")
+    )
+    assert await project_settings.aupdate_constraint("c1", description="updated")
+    c1 = project_settings.get_constraint_by_name("c1")
+    assert c1 is not None and c1.description == "updated"
+
+    assert await project_settings.aremove_constraint("c1")
+    assert not await project_settings.aremove_constraint("c1")
+
+
+def test_constraints_are_hashable() -> None:
+    c1 = Constraint(name="c1", description="d", type="hard")
+    c2 = Constraint(name="c2", description="d", type="hard")
+
+    assert len({c1, c1.model_copy(), c2}) == 2
+    assert c1.model_copy() in {c1}
+
+
+def test_constraints_are_immutable(project_settings: ProjectSettings) -> None:
+    c = Constraint(name="c1", description="d", type="hard")
+    project_settings.add_constraint(c)
+
+    with pytest.raises(ValidationError):
+        c.description = "changed"
+    assert project_settings.update_constraint("c1", description="changed")
+    assert c.description == "d"
+
+
+def test_constraint_short_strings_are_interned() -> None:
+    where = "".join(["for all ", "t in T"])
+    a = Constraint(name="a", description="d", type="hard", where=where)
+    b = Constraint.model_construct(
+        name="b", description="d", type="hard", where="".join(["for all t ", "in T"])
+    )
+    assert a.where is b.where
+    assert a.type is b.type
+
+
+def test_updated_constraint_strings_are_interned(
+    project_settings: ProjectSettings,
+) -> None:
+    project_settings.add_constraint(Constraint(name="c1", description="d", type="hard"))
+    where = "".join(["for all ", "j in J"])
+    assert project_settings.update_constraint("c1", where=where)
+
+    c1 = project_settings.get_constraint_by_name("c1")
+    assert c1 is not None
+    assert c1.where is sys.intern("for all j in J")
+
+
+def test_unchanged_snapshot_is_not_rewritten(
+    project_settings: ProjectSettings, project_dir: Path
+) -> None:
+    settings_file = project_dir / "optigen.json"
+    project_settings.update(title="Title")
+    inode = settings_file.stat().st_ino
+
+    project_settings.update(title="Title")
+    project_settings.persist_settings()
+    assert settings_file.stat().st_ino == inode
+
+    project_settings.update(title="Other")
+    assert settings_file.stat().st_ino != inode
+
+
+def test_external_change_is_overwritten_even_if_content_matches_last_write(
+    project_settings: ProjectSettings, project_dir: Path
+) -> None:
+    settings_file = project_dir / "optigen.json"
+    project_settings.persist_settings()
+    written = settings_file.read_text()
+
+    settings_file.write_text(ProjectSnapshot(title="External").model_dump_json())
+    project_settings.persist_settings()
+    assert settings_file.read_text() == written
+
+
+def test_snapshot_json_is_cached_until_change(
+    project_settings: ProjectSettings,
+) -> None:
+    first = project_settings.snapshot_json()
+    assert project_settings.snapshot_json() is first
+
+    project_settings.add_constraint(Constraint(name="c1", description="d", type="hard"))
+    updated = project_settings.snapshot_json()
+    assert updated is not first
+    assert json.loads(updated)["constraints"][0]["name"] == "c1"
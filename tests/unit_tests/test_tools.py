@@ -0,0 +1,137 @@
+import asyncio
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+import langchain_tavily
+import pytest
+
+from react_agent import tools
+from react_agent.types import Scenario
+
+
+@pytest.fixture
+def project_settings(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    settings = MagicMock()
+    runtime = SimpleNamespace(
+        context=SimpleNamespace(project_settings=settings, max_search_results=3)
+    )
+    monkeypatch.setattr(tools, "get_runtime", lambda context_schema: runtime)
+    return settings
+
+
+def test_update_project_metadata_updates_once(project_settings: MagicMock) -> None:
+    result = tools.update_project_metadata(title="Shifts", description="Staffing")
+
+    project_settings.update.assert_called_once_with(
+        title="Shifts", description="Staffing"
+    )
+    assert result == (
+        "Successfully updated project metadata: title='Shifts', description='Staffing'."
+    )
+
+
+def test_update_project_metadata_without_fields(project_settings: MagicMock) -> None:
+    assert tools.update_project_metadata() == "No updates provided."
+    project_settings.update.assert_not_called()
+
+
+def test_add_scenario_builds_scenario(project_settings: MagicMock) -> None:
+    tools.add_scenario("scenarios/s1.json", "s1", "Small instance")
+
+    project_settings.add_scenario.assert_called_once_with(
+        Scenario(
+            name="s1", description="Small instance", request=Path("scenarios/s1.json")
+        )
+    )
+
+
+def test_update_request_schema_returns_summary(
+    project_settings: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    project_settings.project_snapshot.schema_definition = None
+    schema = {"type": "object", "properties": {"n": {"type": "integer"}}}
+
+    monkeypatch.delenv("OPTIGEN_VERBOSE_TOOL_RETURNS", raising=False)
+    result = tools.update_request_schema(schema)
+    assert result.startswith("Successfully updated request schema: 2 top-level fields")
+    assert '"properties"' not in result
+
+    monkeypatch.setenv("OPTIGEN_VERBOSE_TOOL_RETURNS", "1")
+    assert '"properties"' in tools.update_request_schema(schema)
+
+
+class FakeTavilySearch:
+    calls = 0
+
+    def __init__(self, max_results: int) -> None:
+        self.max_results = max_results
+
+    async def ainvoke(self, payload: dict[str, str]) -> dict[str, Any]:
+        FakeTavilySearch.calls += 1
+        if payload["query"] == "bad":
+            raise RuntimeError("quota exceeded")
+        return {"query": payload["query"], "results": []}
+
+
+@pytest.fixture
+def fake_tavily(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    FakeTavilySearch.calls = 0
+    monkeypatch.setattr(langchain_tavily, "TavilySearch", FakeTavilySearch)
+    tools._tavily.cache_clear()
+    tools.clear_search_cache()
+    yield
+    tools._tavily.cache_clear()
+    tools.clear_search_cache()
+
+
+@pytest.mark.anyio
+async def test_batch_search_keeps_order_and_reports_failures(
+    project_settings: MagicMock, fake_tavily: None
+) -> None:
+    results = await tools.batch_search(["pyomo", "bad", "vrp"])
+
+    assert results == [
+        {"query": "pyomo", "results": []},
+        {"query": "bad", "error": "quota exceeded"},
+        {"query": "vrp", "results": []},
+    ]
+
+
+@pytest.mark.anyio
+async def test_batch_search_propagates_cancellation(
+    project_settings: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def cancelled_search(query: str, max_results: int) -> dict[str, Any]:
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(tools, "_cached_search", cancelled_search)
+    with pytest.raises(asyncio.CancelledError):
+        await tools.batch_search(["pyomo"])
+
+
+def test_tavily_client_is_shared(fake_tavily: None) -> None:
+    assert tools._tavily(3) is tools._tavily(3)
+    assert tools._tavily(5) is not tools._tavily(3)
+
+
+@pytest.mark.anyio
+async def test_repeated_searches_are_cached(
+    project_settings: MagicMock,
+    fake_tavily: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    first = await tools.search("pyomo")
+    assert await tools.search("pyomo") is first
+    await tools.batch_search(["pyomo", "bad", "bad"])
+    assert FakeTavilySearch.calls == 3
+
+    tools.clear_search_cache()
+    await tools.search("pyomo")
+    assert FakeTavilySearch.calls == 4
+
+    monkeypatch.setattr(tools, "_SEARCH_CACHE_TTL_S", 0.0)
+    await tools.search("pyomo")
+    assert FakeTavilySearch.calls == 5